@@ -0,0 +1,63 @@
+from flask import Blueprint, request, jsonify, abort, Response
+from flask_login import login_required, current_user
+from functools import wraps
+from services.tracing import profiler
+import os
+import logging
+
+admin_bp = Blueprint('admin', __name__)
+logger = logging.getLogger(__name__)
+
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()}
+
+def admin_required(view):
+    @wraps(view)
+    @login_required
+    def wrapper(*args, **kwargs):
+        if (current_user.email or '').lower() not in ADMIN_EMAILS:
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
+
+def profiler_status():
+    return {
+        'active': profiler.active,
+        'rate': profiler.rate,
+        'sampled_requests': profiler.sampled_requests,
+        'output': profiler.last_output,
+        'pid': os.getpid()
+    }
+
+@admin_bp.route('/profiling')
+@admin_required
+def profiling_status():
+    return jsonify(profiler_status())
+
+@admin_bp.route('/profiling/start', methods=['POST'])
+@admin_required
+def start_profiling():
+    try:
+        percent = float(request.form.get('percent', '10'))
+    except ValueError:
+        return jsonify({'error': 'percent must be a number'}), 400
+    if not 0 < percent <= 100:
+        return jsonify({'error': 'percent must be between 0 and 100'}), 400
+    
+    profiler.start(percent / 100)
+    logger.info(f"Profiling started by {current_user.email}")
+    return jsonify(profiler_status())
+
+@admin_bp.route('/profiling/stop', methods=['POST'])
+@admin_required
+def stop_profiling():
+    if profiler.active:
+        if profiler.stop() is None:
+            return jsonify(dict(profiler_status(), error='Profile could not be written - download it from /admin/profiling/output')), 500
+        logger.info(f"Profiling stopped by {current_user.email}")
+    return jsonify(profiler_status())
+
+@admin_bp.route('/profiling/output')
+@admin_required
+def profiling_output():
+    return Response(profiler.folded(), mimetype='text/plain',
+                    headers={'Content-Disposition': 'attachment; filename=profile.folded'})
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, make_response
 from flask_login import LoginManager, current_user
 from flask_wtf.csrf import CSRFProtect
 from dotenv import load_dotenv
@@ -28,6 +28,10 @@ app.secret_key = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
 # Configure CSRF protection
 csrf = CSRFProtect(app)
 
+# Configure request tracing and profiling
+from services.tracing import init_tracing, span, traced
+init_tracing(app)
+
 # Configure Login Manager
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
@@ -36,14 +40,33 @@ login_manager.init_app(app)
 # Import blueprints after app creation to avoid circular imports
 from auth.routes import auth_bp
 from chatbot.routes import chat_bp
+from admin.routes import admin_bp
 
 # Register Blueprints
 app.register_blueprint(auth_bp, url_prefix='/auth')
 app.register_blueprint(chat_bp, url_prefix='/chat')
+app.register_blueprint(admin_bp, url_prefix='/admin')
+
+# Configure response compression and caching
+from services.http_cache import init_http_cache, plan_etag, etag_matches, not_modified, cache_page
+init_http_cache(app)
 
 # Import services after app creation
 from services.firebase_service import db
-from services.palm_service import generate_coaching_prompt
+from services.palm_service import generate_coaching_plan, regenerate_section, regenerate_week
+from services.plan_service import PLAN_SECTIONS, iter_weeks, render_plan, summarize_plan
+
+@app.template_filter('datetimeformat')
+def datetimeformat(value, format='%b %d, %Y'):
+    """Format a datetime or the ISO string stored in created_at"""
+    if not value:
+        return ''
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value.strftime(format)
 
 @login_manager.user_loader
 def load_user(user_id):
@@ -71,10 +94,20 @@ def index():
                     'motivational_style': request.form.get('motivational_style', 'encouraging'),
                     'length': request.form.get('length', 'medium')
                 },
+                'plan_duration': request.form.get('plan_duration') or '8',
+                'training_hours': request.form.get('training_hours') or '0',
+                'rest_days': request.form.get('rest_days') or '1',
                 'created_at': datetime.now().isoformat(),
                 'user_id': current_user.id
             }
             
+            # Generate plan
+            plan = generate_coaching_plan(user_profile)
+            user_profile['plan'] = plan
+            user_profile['plan_summary'] = summarize_plan(plan)
+            user_profile['plan_version'] = 1
+            logger.info("Coaching plan generated successfully")
+            
             # Save profile
             try:
                 profile_ref = save_user_profile(user_profile)
@@ -85,19 +118,7 @@ def index():
                 logger.error(f"Error saving profile: {str(e)}")
                 flash('Note: Coaching not being saved to database', 'warning')
             
-            # Generate prompt
-            prompt = generate_coaching_prompt(user_profile)
-            logger.info("Coaching prompt generated successfully")
-            
-            return render_template('results.html',
-                       prompt=prompt,
-                       profile_id=profile_id,
-                       sport_name=user_profile['sport'].replace('_', ' ').title(),
-                       level=user_profile['level'],
-                       goals=user_profile['goals'],
-                       plan_duration=request.form.get('plan_duration', '8'),
-                       training_hours=request.form.get('training_hours', '0'),
-                       rest_days=request.form.get('rest_days', '1'))
+            return render_results(user_profile, profile_id)
         
         except Exception as e:
             logger.error(f"Error generating prompt: {str(e)}")
@@ -131,6 +152,78 @@ def feedback():
     
     return redirect(url_for('index'))
 
+def render_results(user_profile, profile_id):
+    plan_html = render_plan(user_profile['plan'], user_profile)
+    with span('render results.html'):
+        return render_template('results.html',
+                               plan_html=plan_html,
+                               profile_id=profile_id,
+                               sport_name=user_profile['sport'].replace('_', ' ').title(),
+                               level=user_profile['level'],
+                               goals=user_profile['goals'],
+                               plan_duration=user_profile.get('plan_duration', '8'),
+                               training_hours=user_profile.get('training_hours', '0'),
+                               rest_days=user_profile.get('rest_days', '1'),
+                               sections=PLAN_SECTIONS,
+                               week_numbers=[week['number'] for week in iter_weeks(user_profile['plan'])])
+
+@app.route('/plan/<profile_id>')
+def view_plan(profile_id):
+    if not current_user.is_authenticated:
+        return redirect(url_for('auth.login'))
+    
+    user_profile = get_plan_profile(profile_id, current_user.id)
+    if user_profile is None:
+        flash('Training plan not found', 'error')
+        return redirect(url_for('dashboard'))
+    
+    # Skip rendering entirely when the browser already has this plan version
+    etag = plan_etag(profile_id, user_profile.get('plan_version', 1))
+    if etag:
+        cached = etag_matches(etag)
+        if cached:
+            return not_modified(cached)
+    
+    response = make_response(render_results(user_profile, profile_id))
+    return cache_page(response, etag) if etag else response
+
+@app.route('/plan/<profile_id>/regenerate', methods=['POST'])
+def regenerate_plan(profile_id):
+    if not current_user.is_authenticated:
+        return redirect(url_for('auth.login'))
+    
+    user_profile = get_plan_profile(profile_id, current_user.id)
+    if user_profile is None:
+        flash('Training plan not found', 'error')
+        return redirect(url_for('dashboard'))
+    
+    section = request.form.get('section', '')
+    instructions = request.form.get('instructions', '').strip()[:500]
+    rest_days = request.form.get('rest_days', '').strip()
+    try:
+        if rest_days and section != 'week':
+            raise ValueError('Rest days can only be changed when regenerating a week')
+        if rest_days and (not rest_days.isdigit() or int(rest_days) > 7):
+            raise ValueError('Rest days must be between 0 and 7')
+        
+        if section == 'week':
+            # A rest-days override applies to the regenerated week only
+            plan = regenerate_week(user_profile['plan'], user_profile, int(request.form.get('week', '')),
+                                   instructions, rest_days or None)
+        else:
+            plan = regenerate_section(user_profile['plan'], user_profile, section, instructions)
+        
+        if update_plan(profile_id, plan, user_profile.get('plan_version', 1)):
+            logger.info(f"Regenerated {section} for profile: {profile_id}")
+            flash('Plan updated', 'success')
+        else:
+            flash('Your plan was changed by another edit. Please review it and try again.', 'warning')
+    except Exception as e:
+        logger.error(f"Error regenerating plan: {str(e)}")
+        flash(f'Error updating plan: {str(e)}', 'error')
+    
+    return redirect(url_for('view_plan', profile_id=profile_id))
+
 @app.route('/dashboard')
 def dashboard():
     if not current_user.is_authenticated:
@@ -145,7 +238,8 @@ def dashboard():
         logger.error(f"Error loading plans: {str(e)}")
         flash('Could not load your previous plans', 'warning')
     
-    return render_template('dashboard.html', plans=plans)
+    with span('render dashboard.html'):
+        return render_template('dashboard.html', plans=plans)
 
 def save_user_profile(profile_data):
     if db is None:
@@ -178,6 +272,7 @@ def save_prompt_feedback(profile_id, feedback_value):
         logger.error(f"Error saving feedback: {str(e)}")
         return False
 
+@traced('app.get_user_profile')
 def get_user_profile(user_id):
     if db is None:
         logger.warning("Firestore not initialized - returning empty profile list")
@@ -185,13 +280,58 @@ def get_user_profile(user_id):
     
     try:
         docs = db.collection('user_profiles').where('user_id', '==', user_id).order_by('created_at', direction=firestore.Query.DESCENDING).stream()
-        profiles = [doc.to_dict() for doc in docs]
+        profiles = [dict(doc.to_dict(), id=doc.id) for doc in docs]
         logger.info(f"Retrieved {len(profiles)} profiles for user: {user_id}")
         return profiles
     except Exception as e:
         logger.error(f"Error getting user profiles: {str(e)}")
         return []
 
+@traced('app.get_plan_profile')
+def get_plan_profile(profile_id, user_id):
+    if db is None or profile_id == 'local':
+        return None
+    
+    try:
+        doc = db.collection('user_profiles').document(profile_id).get()
+        if not doc.exists:
+            return None
+        profile = doc.to_dict()
+        if profile.get('user_id') != user_id or 'plan' not in profile:
+            return None
+        return profile
+    except Exception as e:
+        logger.error(f"Error getting plan {profile_id}: {str(e)}")
+        return None
+
+def update_plan(profile_id, plan, expected_version):
+    """Store a regenerated plan only if it is still based on the stored version"""
+    if db is None:
+        logger.warning("Firestore not initialized - plan not updated")
+        return False
+    
+    doc_ref = db.collection('user_profiles').document(profile_id)
+    
+    @firestore.transactional
+    def apply_update(transaction):
+        snapshot = doc_ref.get(transaction=transaction)
+        if (snapshot.to_dict() or {}).get('plan_version', 1) != expected_version:
+            return False
+        transaction.update(doc_ref, {
+            'plan': plan,
+            'plan_summary': summarize_plan(plan),
+            'plan_version': expected_version + 1,
+            'updated_at': firestore.SERVER_TIMESTAMP
+        })
+        return True
+    
+    if not apply_update(db.transaction()):
+        logger.warning(f"Plan update conflict for profile: {profile_id} (expected version {expected_version})")
+        return False
+    
+    logger.info(f"Plan updated for profile: {profile_id} (version {expected_version + 1})")
+    return True
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=os.getenv('FLASK_DEBUG', 'False') == 'True')
\ No newline at end of file
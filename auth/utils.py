@@ -1,5 +1,6 @@
 from flask_login import UserMixin
 import logging
+from services.tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +11,7 @@ class User(UserMixin):
         self.name = name
     
     @staticmethod
+    @traced('User.get')
     def get(user_id):
         from services.firebase_service import db
         try:
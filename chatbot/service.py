@@ -2,6 +2,7 @@ import google.generativeai as genai
 import os
 from dotenv import load_dotenv
 from services.firebase_service import get_user_profile
+from services.tracing import span
 
 load_dotenv()
 
@@ -22,23 +23,24 @@ def generate_chat_response(question, user_id):
         sport = user_profile.get('sport', 'general') if user_profile else 'general'
         level = user_profile.get('level', 'intermediate') if user_profile else 'intermediate'
         
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        with span('build chat prompt'):
+            prompt = f"""
+            You are an expert sports coach assistant specializing in {sport} for {level} level athletes.
+            The user has asked: "{question}"
         
-        prompt = f"""
-        You are an expert sports coach assistant specializing in {sport} for {level} level athletes.
-        The user has asked: "{question}"
+            Provide a detailed, professional response that:
+            1. Directly answers the question with technical accuracy
+            2. Includes sport-specific advice when applicable
+            3. Provides actionable recommendations
+            4. Considers the athlete's level ({level})
+            5. Is clear and concise (under 300 words)
         
-        Provide a detailed, professional response that:
-        1. Directly answers the question with technical accuracy
-        2. Includes sport-specific advice when applicable
-        3. Provides actionable recommendations
-        4. Considers the athlete's level ({level})
-        5. Is clear and concise (under 300 words)
+            If the question is not sports-related, politely redirect to sports topics.
+            """
         
-        If the question is not sports-related, politely redirect to sports topics.
-        """
-        
-        response = model.generate_content(prompt)
+        with span('gemini generate_content'):
+            model = genai.GenerativeModel('gemini-1.5-flash')
+            response = model.generate_content(prompt)
         return response.text
     except Exception as e:
         print(f"Chat generation failed: {e}")
@@ -4,6 +4,7 @@ from firebase_admin.exceptions import FirebaseError
 import os
 from dotenv import load_dotenv
 import logging
+from services.tracing import traced
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -88,6 +89,7 @@ def save_prompt_feedback(profile_id, feedback_value):
         logger.error(f"Error saving feedback: {str(e)}")
         return False
 
+@traced('firebase_service.get_user_profile')
 def get_user_profile(user_id):
     if db is None:
         logger.warning("Firestore not initialized - returning empty profile list")
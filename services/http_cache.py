@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+import os
+import time
+import logging
+from flask import current_app, request, session, url_for
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+from werkzeug.security import safe_join
+
+logger = logging.getLogger(__name__)
+
+# Brotli is optional - gzip is used when it is not installed
+BROTLI_AVAILABLE = False
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPRESSIBLE_TYPES = {
+    'text/html',
+    'text/css',
+    'text/javascript',
+    'application/javascript',
+    'application/json'
+}
+MIN_COMPRESS_SIZE = 500
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+_fingerprints = {}
+_compressed_static = {}
+_build_id = None
+
+def _digest(*parts):
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+
+def _file_fingerprint(path):
+    """Content hash of a file, recomputed only when its mtime changes"""
+    mtime = os.path.getmtime(path)
+    cached = _fingerprints.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = _fingerprints[path] = (mtime, hashlib.md5(f.read()).hexdigest()[:12])
+    return cached[1]
+
+def static_url(filename):
+    """URL for a static file carrying its content fingerprint, safe to cache forever"""
+    path = os.path.join(current_app.static_folder, filename)
+    return url_for('static', filename=filename, v=_file_fingerprint(path))
+
+def build_id():
+    """Fingerprint of all templates and static files, so page ETags change on deploy"""
+    global _build_id
+    if _build_id is None or current_app.debug:
+        paths = []
+        for folder in (current_app.template_folder, current_app.static_folder):
+            root = os.path.join(current_app.root_path, folder)
+            for dirpath, _, filenames in os.walk(root):
+                paths.extend(os.path.join(dirpath, name) for name in filenames)
+        _build_id = _digest(*(_file_fingerprint(path) for path in sorted(paths)))
+    return _build_id
+
+def plan_etag(profile_id, version):
+    """Strong ETag for a rendered plan page, or None if the page must not be reused"""
+    if session.get('_flashes'):
+        return None
+
+    # The page also embeds the user's name and a CSRF token that expires.
+    # Create the session token now so the first view's ETag matches later ones.
+    generate_csrf()
+    csrf_limit = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    csrf_window = int(time.time() // csrf_limit) if csrf_limit else 0
+    return _digest(build_id(), profile_id, version,
+                   current_user.id, current_user.name,
+                   session.get(current_app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token')),
+                   csrf_window)
+
+def etag_matches(etag):
+    """Return the representation of etag the client already has, if any"""
+    for candidate in (etag, f'{etag}-gzip', f'{etag}-br'):
+        if candidate in request.if_none_match:
+            return candidate
+    return None
+
+def cache_page(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def not_modified(etag):
+    response = current_app.response_class(status=304)
+    response.vary.add('Accept-Encoding')
+    return cache_page(response, etag)
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if BROTLI_AVAILABLE and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+def _static_data(encoding):
+    """Compressed bytes of the requested static file, cached per file version"""
+    path = safe_join(current_app.static_folder, request.view_args['filename'])
+    key = (path, encoding)
+    mtime = os.path.getmtime(path)
+    cached = _compressed_static.get(key)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = _compressed_static[key] = (mtime, _compress(f.read(), encoding))
+    return cached[1]
+
+def compress_response(response):
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return response
+
+    # The representation depends on Accept-Encoding even when it goes out
+    # uncompressed (small bodies, 206 ranges), so shared caches must key on it
+    response.vary.add('Accept-Encoding')
+    if response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if request.endpoint == 'static':
+        # send_file only compared the identity ETag, so check the encoded one here
+        etag, weak = response.get_etag()
+        if hasattr(response.response, 'close'):
+            response.response.close()
+        response.direct_passthrough = False
+        if etag and request.if_none_match.contains_weak(f'{etag}-{encoding}'):
+            response.set_data(b'')
+            response.status_code = 304
+            response.headers.pop('Accept-Ranges', None)
+            response.set_etag(f'{etag}-{encoding}', weak)
+            return response
+        data = _static_data(encoding)
+    elif response.direct_passthrough:
+        return response
+    else:
+        data = response.get_data()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return response
+        data = _compress(data, encoding)
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+
+    # Byte ranges would refer to the uncompressed file, not this body
+    response.headers.pop('Accept-Ranges', None)
+
+    # Each encoding is a different representation, so it needs its own ETag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f'{etag}-{encoding}', weak)
+    return response
+
+def cache_static(response):
+    """Fingerprinted static URLs never change content, so cache them for a year"""
+    if request.endpoint == 'static' and request.args.get('v'):
+        response.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}, immutable'
+    return response
+
+def init_http_cache(app):
+    app.jinja_env.globals['static_url'] = static_url
+
+    @app.after_request
+    def apply_http_cache(response):
+        try:
+            return compress_response(cache_static(response))
+        except Exception as e:
+            logger.error(f"Error applying HTTP caching: {str(e)}")
+            return response
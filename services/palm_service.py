@@ -1,6 +1,13 @@
 import google.generativeai as genai
+import json
 import os
 from dotenv import load_dotenv
+from services.plan_service import (
+    PLAN_SCHEMA, PLAN_SECTIONS, SECTION_SCHEMAS, WEEK_SCHEMA,
+    describe_schema, find_week, merge_section, merge_week, parse_json,
+    validate_plan, validate_section, validate_week
+)
+from services.tracing import span, traced
 
 load_dotenv()
 
@@ -12,136 +19,114 @@ try:
 except:
     GEMINI_AVAILABLE = False
 
-def generate_coaching_prompt(user_profile):
+def _generate_json(prompt):
+    with span('gemini generate_content'):
+        model = genai.GenerativeModel('gemini-1.5-flash')
+        response = model.generate_content(prompt)
+        return response.text
+
+def _athlete_context(user_profile):
+    return (
+        f"{user_profile['sport']} athlete at {user_profile['level']} level with goals: {', '.join(user_profile['goals'])}. "
+        f"Trains {user_profile.get('training_hours', '0')} hours and takes {user_profile.get('rest_days', '1')} rest days per week. "
+        f"Use a {user_profile['preferences']['motivational_style']} tone and {user_profile['preferences']['length']} length."
+    )
+
+def generate_coaching_plan(user_profile):
+    """Generate a structured plan document for the athlete"""
     if not GEMINI_AVAILABLE:
-        return generate_fallback_response(user_profile)
+        return generate_fallback_plan(user_profile)
     
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        
-        prompt = f"""
-        Create a comprehensive {user_profile['sport']} training plan for a {user_profile['level']} athlete with these goals: {', '.join(user_profile['goals'])}.
-        
-        Structure the response EXACTLY as follows:
-
-        <div class='coaching-plan'>
-        <div class='plan-header'>
-        <h2>{user_profile['sport'].title()} Performance Blueprint</h2>
-        <h3>For {user_profile['level'].title()} Level Athletes</h3>
-        </div>
-
-        <div class='motivation-section'>
-        <h4>Mindset Preparation</h4>
-        <p><strong>Key Motivation:</strong> [2-3 sentence inspiring message]</p>
-        <p><strong>Performance Focus:</strong> [Main area to concentrate on]</p>
-        </div>
-
-        <div class='weekly-plan'>
-        <h4>8-Week Training Structure</h4>
-        <div class='week-section'>
-        <h5>Week 1-2: Foundation Phase</h5>
-        <p><strong>Monday - Technique Development:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Tuesday - Endurance Building:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Wednesday - Active Recovery:</strong> [Detailed activities including mobility work, foam rolling, and light cardio]</p>
-        <p><strong>Thursday - Strength & Power:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Friday - Skill Refinement:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Saturday - Long Duration Session:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Sunday - Complete Rest:</strong> Mental recovery and preparation for next week</p>
-        </div>
-
-        <div class='week-section'>
-        <h5>Week 3-4: Build Phase</h5>
-        <p><strong>Monday - Advanced Technique:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Tuesday - High-Intensity Intervals:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Wednesday - Active Recovery & Mobility:</strong> [Detailed activities including yoga, foam rolling, and light swimming]</p>
-        <p><strong>Thursday - Strength & Power:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Friday - Competition Simulation:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Saturday - Progressive Overload Session:</strong> [Detailed workout including warm-up, main sets, cool-down, duration, and specific focus]</p>
-        <p><strong>Sunday - Active Recovery:</strong> Light cross-training and mental preparation</p>
-        </div>
-        
-        <div class='week-section'>
-        <h5>Week 5-6: Intensity Phase</h5>
-        [Same detailed structure...]
-        </div>
-        
-        <div class='week-section'>
-        <h5>Week 7-8: Peak Performance Phase</h5>
-        [Same detailed structure...]
-        </div>
-        </div>
-
-        <div class='technical-section'>
-        <h4>Technical Excellence</h4>
-        <p><strong>Key Drill:</strong> [Specific drill with step-by-step instructions]</p>
-        <p><strong>Game-Specific Techniques:</strong> [3-5 sport-specific technical tips for in-game situations]</p>
-        <p><strong>Tactical Insights:</strong> [Positioning strategies and decision-making guidance]</p>
-        <p><strong>Common Mistakes:</strong> [Frequent errors and how to correct them]</p>
-        <p><strong>Equipment Optimization:</strong> [Specific guidance on gear selection and usage]</p>
-        </div>
-
-        <div class='recovery-section'>
-        <h4>Optimal Recovery Protocol</h4>
-        <p><strong>Active Recovery:</strong> [Detailed recommendations including specific exercises and durations]</p>
-        <p><strong>Nutrition:</strong> [Specific meal timing, macro ratios, and hydration strategies]</p>
-        <p><strong>Sleep Protocol:</strong> [Optimal sleep duration and quality enhancement techniques]</p>
-        <p><strong>Injury Prevention:</strong> [Specific exercises and warning signs to monitor]</p>
-        </div>
-        
-        <div class='progress-tracking'>
-        <h4>Performance Metrics Tracking</h4>
-        <p><strong>Weekly Assessments:</strong> [Specific metrics to track each week]</p>
-        <p><strong>Key Performance Indicators:</strong> [Benchmarks for success at each phase]</p>
-        </div>
-        </div>
-
-        Use a {user_profile['preferences']['motivational_style']} tone and {user_profile['preferences']['length']} length.
-        Include:
-        - Exact durations, distances, weights, and intensities
-        - Specific exercise names and descriptions
-        - Progressive overload principles
-        - Periodization details
-        - Sport-specific technical cues
-        
-        For the Technical Excellence section:
-        - Provide 3-5 specific game techniques relevant to {user_profile['sport']}
-        - Include tactical positioning advice for different game situations
-        - List common mistakes and their corrections
-        - Add sport-specific equipment tips
-        """
-        
-        response = model.generate_content(prompt)
-        return format_response(response.text, user_profile)
+        with span('build plan prompt'):
+            weeks = int(user_profile.get('plan_duration', 8))
+            prompt = f"""
+            Create a comprehensive {weeks}-week training plan for a {_athlete_context(user_profile)}
+
+            Respond with a single JSON object only, no markdown or HTML, with exactly this structure:
+            {describe_schema(PLAN_SCHEMA)}
+
+            - Split the {weeks} weeks into progressive phases (e.g. Foundation, Build, Intensity, Peak)
+            - Number weeks 1 to {weeks}; each week lists all seven days, Monday to Sunday
+            - Each workout gives exact durations, distances, weights and intensities with warm-up, main sets and cool-down
+            - Apply progressive overload and periodization across phases
+            - technical.techniques holds 3-5 game techniques specific to {user_profile['sport']}
+            - Cover tactical positioning, common mistakes with corrections, and equipment tips
+            """
+        return format_response(_generate_json(prompt), user_profile)
     except Exception as e:
         print(f"Gemini generation failed: {e}")
-        return generate_fallback_response(user_profile)
+        return generate_fallback_plan(user_profile)
 
-def format_response(response, user_profile):
-    """Format the response with proper HTML structure"""
-    # Clean up markdown artifacts
-    cleaned_response = (
-        response
-        .replace('*', '')
-        .replace('#', '')
-        .replace('**', '')
-        .replace('__', '')
-    )
+def _change_request(instructions):
+    if not instructions:
+        return ''
+    return f'Apply this change requested by the athlete: "{instructions.strip()}"'
+
+def regenerate_week(plan, user_profile, number, instructions='', rest_days=None):
+    """Regenerate a single week of a plan and merge it back in"""
+    phase, week = find_week(plan, number)
+    if not GEMINI_AVAILABLE:
+        raise RuntimeError("Plan regeneration is unavailable")
     
-    # Convert to proper HTML paragraphs
-    formatted_paragraphs = [
-        f"<p>{line}</p>" if not line.startswith('<') else line
-        for line in cleaned_response.split('\n')
-        if line.strip()
-    ]
+    prompt = f"""
+    Rewrite week {number} of a training plan for a {_athlete_context(user_profile)}
+    The week belongs to the {phase['name']} phase ({phase['focus']}).
+    The current week is: {json.dumps(week, separators=(',', ':'))}
+    Schedule exactly {rest_days or user_profile.get('rest_days', '1')} rest days in this week.
+    {_change_request(instructions)}
+
+    Respond with a single JSON object only, no markdown or HTML, with exactly this structure:
+    {describe_schema(WEEK_SCHEMA)}
+    Keep "number" as {number} and list all seven days, Monday to Sunday.
+    """
+    new_week = validate_week(parse_json(_generate_json(prompt)))
+    new_week['number'] = number
+    return merge_week(plan, new_week)
+
+def regenerate_section(plan, user_profile, section, instructions=''):
+    """Regenerate one of the plan's text sections and merge it back in"""
+    if section not in PLAN_SECTIONS:
+        raise ValueError(f"Unknown plan section: {section}")
+    if not GEMINI_AVAILABLE:
+        raise RuntimeError("Plan regeneration is unavailable")
     
-    return f"""
-    <div class='coaching-plan {user_profile["sport"]}-plan {user_profile["level"]}-level'>
-        {"".join(formatted_paragraphs)}
-    </div>
+    prompt = f"""
+    Rewrite the {section} section of the training plan "{plan['title']}" for a {_athlete_context(user_profile)}
+    The plan's phases are: {', '.join(phase['name'] for phase in plan['phases'])}.
+    The current section is: {json.dumps(plan[section], separators=(',', ':'))}
+    {_change_request(instructions)}
+
+    Respond with a single JSON object only, no markdown or HTML, with exactly this structure:
+    {describe_schema(SECTION_SCHEMAS[section])}
     """
+    content = validate_section(section, parse_json(_generate_json(prompt)))
+    return merge_section(plan, section, content)
+
+@traced('palm_service.format_response')
+def format_response(response, user_profile):
+    """Parse the model response into a validated plan document"""
+    return validate_plan(parse_json(response), weeks=int(user_profile.get('plan_duration', 8)))
+
+FALLBACK_WEEK = [
+    ('Monday', 'Technique', 'Warm-up 15 min, technical drills 40 min, cool-down 10 min'),
+    ('Tuesday', 'Endurance', 'Warm-up 10 min, steady aerobic work 45 min, cool-down 10 min'),
+    ('Wednesday', 'Recovery', 'Mobility work, foam rolling and 20 min light cardio'),
+    ('Thursday', 'Strength', 'Warm-up 10 min, compound lifts 4x6 at 75% effort, core work 15 min'),
+    ('Friday', 'Skills', 'Warm-up 15 min, game-situation skill work 40 min, cool-down 10 min'),
+    ('Saturday', 'Long Session', 'Extended sport-specific session of 75-90 min at moderate intensity'),
+    ('Sunday', 'Rest', 'Complete rest, mental recovery and preparation for next week')
+]
+
+FALLBACK_PHASES = [
+    ('Foundation', 'Movement quality and aerobic base'),
+    ('Build', 'Progressive volume and technical consistency'),
+    ('Intensity', 'Higher intensity and sport-specific power'),
+    ('Peak', 'Sharpening and competition readiness')
+]
 
-def generate_fallback_response(user_profile):
-    """Structured fallback response with enhanced technical section"""
+def generate_fallback_plan(user_profile):
+    """Structured fallback plan used when Gemini is unavailable"""
     sport = user_profile['sport'].lower()
     technical_tips = {
         'basketball': [
@@ -172,42 +157,54 @@ def generate_fallback_response(user_profile):
     }
     
     tips = technical_tips.get(sport, technical_tips['default'])
-    tips_html = "".join([f"<li>{tip}</li>" for tip in tips])
+    weeks = max(int(user_profile.get('plan_duration', 8)), 1)
     
-    return f"""
-    <div class='coaching-plan'>
-        <div class='plan-header'>
-            <h2>{user_profile['sport'].title()} Training Plan</h2>
-            <h3>For {user_profile['level'].title()} Athletes</h3>
-        </div>
-        
-        <div class='motivation-section'>
-            <h4>General Guidance</h4>
-            <p><strong>Key Focus:</strong> Consistent practice on {', '.join(user_profile['goals'])}</p>
-            <p><strong>Weekly Structure:</strong> 
-            <strong>Mon:</strong> Technique, 
-            <strong>Tue:</strong> Endurance, 
-            <strong>Wed:</strong> Recovery, 
-            <strong>Thu:</strong> Strength, 
-            <strong>Fri:</strong> Skills, 
-            <strong>Sat:</strong> Long Session, 
-            <strong>Sun:</strong> Rest</p>
-        </div>
-        
-        <div class='technical-section'>
-            <h4>Technical Excellence</h4>
-            <p><strong>Key Drill:</strong> Sport-specific fundamental drill</p>
-            <p><strong>Game-Specific Techniques:</strong></p>
-            <ul>{tips_html}</ul>
-            <p><strong>Tactical Insights:</strong> Position yourself according to game situation</p>
-            <p><strong>Common Mistakes:</strong> Avoid overcomplicating plays under pressure</p>
-            <p><strong>Equipment Optimization:</strong> Ensure proper gear fit and maintenance</p>
-        </div>
-        
-        <div class='recovery-section'>
-            <h4>Recovery Protocol</h4>
-            <p><strong>Daily:</strong> 8 hours sleep, hydration (35ml/kg body weight)</p>
-            <p><strong>Post-workout:</strong> 3:1 carb-to-protein ratio within 30 minutes</p>
-        </div>
-    </div>
-    """
\ No newline at end of file
+    # Spread weeks evenly so every phase gets at least one when there are enough
+    phase_count = min(weeks, len(FALLBACK_PHASES))
+    per_phase, extra = divmod(weeks, phase_count)
+    
+    phases = []
+    first = 1
+    for index, (name, focus) in enumerate(FALLBACK_PHASES[:phase_count]):
+        size = per_phase + (1 if index < extra else 0)
+        numbers = range(first, first + size)
+        first += size
+        phases.append({
+            'name': name,
+            'focus': focus,
+            'weeks': [
+                {
+                    'number': number,
+                    'days': [{'day': day, 'focus': day_focus, 'workout': workout}
+                             for day, day_focus, workout in FALLBACK_WEEK]
+                }
+                for number in numbers
+            ]
+        })
+    
+    return {
+        'title': f"{user_profile['sport'].replace('_', ' ').title()} Training Plan",
+        'subtitle': f"For {user_profile['level'].title()} Athletes",
+        'motivation': {
+            'key_motivation': 'Consistency beats intensity. Show up, do the work and trust the process.',
+            'performance_focus': f"Consistent practice on {', '.join(user_profile['goals']) or 'fundamentals'}"
+        },
+        'phases': phases,
+        'technical': {
+            'key_drill': 'Sport-specific fundamental drill',
+            'techniques': tips,
+            'tactical_insights': 'Position yourself according to game situation',
+            'common_mistakes': 'Avoid overcomplicating plays under pressure',
+            'equipment': 'Ensure proper gear fit and maintenance'
+        },
+        'recovery': {
+            'active_recovery': 'Light mobility and cardio on recovery days',
+            'nutrition': '3:1 carb-to-protein ratio within 30 minutes post-workout',
+            'sleep': '8 hours sleep per night',
+            'injury_prevention': 'Hydration (35ml/kg body weight) and attention to persistent pain'
+        },
+        'tracking': {
+            'weekly_assessments': 'Session completion, perceived effort and one sport-specific benchmark',
+            'kpis': 'Improvement on benchmarks at the end of each phase'
+        }
+    }
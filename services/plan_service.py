@@ -0,0 +1,158 @@
+import copy
+import json
+from flask import render_template
+from services.tracing import span
+
+# Plan document schema. A dict maps required keys to their schemas, a
+# one-element list describes a list of items, and a type is a leaf value.
+DAY_SCHEMA = {'day': str, 'focus': str, 'workout': str}
+WEEK_SCHEMA = {'number': int, 'days': [DAY_SCHEMA]}
+PHASE_SCHEMA = {'name': str, 'focus': str, 'weeks': [WEEK_SCHEMA]}
+
+SECTION_SCHEMAS = {
+    'motivation': {
+        'key_motivation': str,
+        'performance_focus': str
+    },
+    'technical': {
+        'key_drill': str,
+        'techniques': [str],
+        'tactical_insights': str,
+        'common_mistakes': str,
+        'equipment': str
+    },
+    'recovery': {
+        'active_recovery': str,
+        'nutrition': str,
+        'sleep': str,
+        'injury_prevention': str
+    },
+    'tracking': {
+        'weekly_assessments': str,
+        'kpis': str
+    }
+}
+
+PLAN_SCHEMA = {
+    'title': str,
+    'subtitle': str,
+    'motivation': SECTION_SCHEMAS['motivation'],
+    'phases': [PHASE_SCHEMA],
+    'technical': SECTION_SCHEMAS['technical'],
+    'recovery': SECTION_SCHEMAS['recovery'],
+    'tracking': SECTION_SCHEMAS['tracking']
+}
+
+PLAN_SECTIONS = tuple(SECTION_SCHEMAS)
+
+def _validate(value, schema, path):
+    """Check value against schema and return a copy without unknown keys"""
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            raise ValueError(f"{path}: expected an object")
+        missing = [key for key in schema if key not in value]
+        if missing:
+            raise ValueError(f"{path}: missing {', '.join(missing)}")
+        return {key: _validate(value[key], sub, f"{path}.{key}") for key, sub in schema.items()}
+
+    if isinstance(schema, list):
+        if not isinstance(value, list) or not value:
+            raise ValueError(f"{path}: expected a non-empty list")
+        return [_validate(item, schema[0], f"{path}[{i}]") for i, item in enumerate(value)]
+
+    if schema is int:
+        if isinstance(value, str) and value.strip().isdigit():
+            return int(value)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"{path}: expected an integer")
+        return value
+
+    if not isinstance(value, str):
+        raise ValueError(f"{path}: expected text")
+    return value.strip()
+
+def _skeleton(schema):
+    """Build an example document for a schema, used to describe it in prompts"""
+    if isinstance(schema, dict):
+        return {key: _skeleton(sub) for key, sub in schema.items()}
+    if isinstance(schema, list):
+        return [_skeleton(schema[0])]
+    return 0 if schema is int else '...'
+
+def describe_schema(schema):
+    """Compact JSON description of a schema for inclusion in a prompt"""
+    return json.dumps(_skeleton(schema), separators=(',', ':'))
+
+def parse_json(text):
+    """Load a JSON object from model output, tolerating markdown code fences"""
+    cleaned = text.strip()
+    if cleaned.startswith('```'):
+        cleaned = cleaned.split('\n', 1)[1] if '\n' in cleaned else ''
+        cleaned = cleaned.rsplit('```', 1)[0]
+    start, end = cleaned.find('{'), cleaned.rfind('}')
+    if start == -1 or end == -1:
+        raise ValueError("No JSON object in response")
+    return json.loads(cleaned[start:end + 1])
+
+def validate_plan(plan, weeks=None):
+    """Validate a plan, optionally requiring weeks numbered 1 to weeks in order"""
+    plan = _validate(plan, PLAN_SCHEMA, 'plan')
+    numbers = [week['number'] for week in iter_weeks(plan)]
+    if len(numbers) != len(set(numbers)):
+        raise ValueError("plan: duplicate week numbers")
+    if weeks is not None and numbers != list(range(1, weeks + 1)):
+        raise ValueError(f"plan: expected weeks 1 to {weeks}, got {len(numbers)} weeks")
+    return plan
+
+def validate_week(week):
+    return _validate(week, WEEK_SCHEMA, 'week')
+
+def validate_section(section, content):
+    if section not in SECTION_SCHEMAS:
+        raise ValueError(f"Unknown plan section: {section}")
+    return _validate(content, SECTION_SCHEMAS[section], section)
+
+def iter_weeks(plan):
+    for phase in plan['phases']:
+        yield from phase['weeks']
+
+def find_week(plan, number):
+    """Return the (phase, week) pair for a week number"""
+    for phase in plan['phases']:
+        for week in phase['weeks']:
+            if week['number'] == number:
+                return phase, week
+    raise ValueError(f"Week {number} not found in plan")
+
+def merge_week(plan, week):
+    """Return a copy of plan with one week replaced"""
+    merged = copy.deepcopy(plan)
+    phase, existing = find_week(merged, week['number'])
+    phase['weeks'][phase['weeks'].index(existing)] = week
+    return merged
+
+def merge_section(plan, section, content):
+    """Return a copy of plan with one top-level section replaced"""
+    if section not in SECTION_SCHEMAS:
+        raise ValueError(f"Unknown plan section: {section}")
+    merged = copy.deepcopy(plan)
+    merged[section] = content
+    return merged
+
+def summarize_plan(plan):
+    """Small set of fields the dashboard can show without rendering the plan"""
+    return {
+        'title': plan['title'],
+        'weeks': sum(1 for _ in iter_weeks(plan)),
+        'phases': [phase['name'] for phase in plan['phases']],
+        'performance_focus': plan['motivation']['performance_focus']
+    }
+
+def render_plan(plan, user_profile):
+    """Render a plan document to HTML"""
+    with span('render plan/plan.html'):
+        return render_template('plan/plan.html',
+                               plan=plan,
+                               week_count=sum(1 for _ in iter_weeks(plan)),
+                               sport=user_profile['sport'],
+                               level=user_profile['level'])
@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import random
+import logging
+import functools
+import threading
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+# Span tracing is configured at startup; profiling is switched on at runtime
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'False') == 'True'
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '1000'))
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL_MS', '10')) / 1000
+PROFILE_OUTPUT = os.getenv('PROFILE_OUTPUT', 'profile.folded')
+
+_local = threading.local()
+_null_span = nullcontext()
+
+class Span:
+    __slots__ = ('name', 'start', 'duration', 'children')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.duration = None
+        self.children = []
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.start
+
+    def format(self, depth=0):
+        lines = [f"{'  ' * depth}{self.name}: {self.duration * 1000:.1f}ms"]
+        for child in self.children:
+            lines.append(child.format(depth + 1))
+        return '\n'.join(lines)
+
+@contextmanager
+def _timed(stack, name):
+    span = Span(name)
+    stack[-1].children.append(span)
+    stack.append(span)
+    try:
+        yield span
+    finally:
+        span.finish()
+        stack.pop()
+
+def span(name):
+    """Time a block as a child of the current span; a no-op outside a traced request"""
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        return _null_span
+    return _timed(stack, name)
+
+def traced(name=None):
+    """Decorator that records each call to the function as a span"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = getattr(_local, 'stack', None)
+            if stack is None:
+                return func(*args, **kwargs)
+            with _timed(stack, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class SamplingProfiler:
+    """Samples the stacks of selected request threads and counts folded stacks"""
+
+    def __init__(self):
+        self.rate = 0.0
+        self.active = False
+        self.counts = Counter()
+        self.sampled_requests = 0
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._control_lock = threading.Lock()
+        self._thread = None
+        self.last_output = None
+
+    def start(self, rate):
+        with self._control_lock:
+            with self._lock:
+                self.rate = rate
+                self.counts = Counter()
+                self.sampled_requests = 0
+                if not self.active:
+                    self.active = True
+                    self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                    self._thread.start()
+        logger.info(f"Sampling profiler started for {rate:.0%} of requests")
+
+    def stop(self):
+        # Held for the whole stop so a concurrent start() cannot swap in a new thread
+        with self._control_lock:
+            with self._lock:
+                self.active = False
+                self._threads.clear()
+                thread, self._thread = self._thread, None
+            if thread is not None:
+                thread.join()
+
+            # Samples stay in memory for /admin/profiling/output if the write fails
+            try:
+                path = self.write(output_path())
+            except OSError as e:
+                logger.error(f"Error writing profile: {str(e)}")
+                return None
+            self.last_output = path
+        logger.info(f"Sampling profiler stopped, {self.sampled_requests} requests written to {path}")
+        return path
+
+    def should_sample(self):
+        return self.active and random.random() < self.rate
+
+    def add_thread(self, ident):
+        with self._lock:
+            self._threads.add(ident)
+            self.sampled_requests += 1
+
+    def remove_thread(self, ident):
+        with self._lock:
+            self._threads.discard(ident)
+
+    def _run(self):
+        while self.active:
+            time.sleep(PROFILE_INTERVAL)
+            with self._lock:
+                threads = list(self._threads)
+            if not threads:
+                continue
+
+            frames = sys._current_frames()
+            stacks = [self._fold(frames[ident]) for ident in threads if ident in frames]
+            with self._lock:
+                self.counts.update(stacks)
+
+    @staticmethod
+    def _fold(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def folded(self):
+        """Stacks in the collapsed format read by flamegraph.pl and speedscope"""
+        with self._lock:
+            counts = self.counts.most_common()
+        return ''.join(f"{stack} {count}\n" for stack, count in counts)
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            f.write(self.folded())
+        return path
+
+def output_path():
+    """Per-process profile path, so each worker keeps its own profile"""
+    base, ext = os.path.splitext(PROFILE_OUTPUT)
+    return f"{base}.{os.getpid()}{ext}"
+
+profiler = SamplingProfiler()
+
+def _start_request():
+    sampled = profiler.should_sample()
+    if sampled:
+        profiler.add_thread(threading.get_ident())
+    _local.sampled = sampled
+
+    # Profiling alone samples stacks; spans and the slow-request log need tracing
+    if TRACING_ENABLED:
+        _local.stack = [Span(f"{request.method} {request.path}")]
+
+def _finish_request(exc=None):
+    if getattr(_local, 'sampled', False):
+        profiler.remove_thread(threading.get_ident())
+        _local.sampled = False
+
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        return
+    _local.stack = None
+
+    root = stack[0]
+    root.finish()
+    if root.duration * 1000 >= SLOW_REQUEST_MS:
+        logger.warning(f"Slow request ({root.duration * 1000:.0f}ms):\n{root.format()}")
+
+def init_tracing(app):
+    app.before_request(_start_request)
+    app.teardown_request(_finish_request)
+    if TRACING_ENABLED:
+        logger.info(f"Request tracing enabled, slow request threshold {SLOW_REQUEST_MS:.0f}ms")
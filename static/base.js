@@ -0,0 +1,27 @@
+// Enhanced auto-dismiss with smooth animation
+setTimeout(() => {
+    document.querySelectorAll('.alert').forEach(alert => {
+        alert.style.transition = 'all 0.5s ease-out';
+        alert.style.transform = 'translateX(100%)';
+        alert.style.opacity = '0';
+        setTimeout(() => {
+            const bootstrapAlert = new bootstrap.Alert(alert);
+            bootstrapAlert.close();
+        }, 500);
+    });
+}, 5000);
+
+// Add loading state to buttons
+document.querySelectorAll('form').forEach(form => {
+    form.addEventListener('submit', function() {
+        const submitBtn = this.querySelector('button[type="submit"]');
+        if (submitBtn) {
+            const originalText = submitBtn.innerHTML;
+            submitBtn.innerHTML = '<span class="loading-spinner me-2"></span>Processing...';
+            submitBtn.disabled = true;
+        }
+    });
+});
+
+// Add smooth scroll behavior
+document.documentElement.style.scrollBehavior = 'smooth';
@@ -0,0 +1,160 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.querySelector('form');
+    const goals = document.querySelectorAll('input[name="goals"]');
+    const submitBtn = document.querySelector('.submit-btn');
+    const maxGoals = 3;
+    
+    // Set default start date to today
+    const today = new Date().toISOString().split('T')[0];
+    document.getElementById('start_date').value = today;
+    
+    // Enhanced form validation
+    form.addEventListener('submit', function(event) {
+        const sport = document.getElementById('sport');
+        const level = document.querySelector('input[name="level"]:checked');
+        const selectedGoals = document.querySelectorAll('input[name="goals"]:checked');
+        
+        let isValid = true;
+        let errors = [];
+        
+        // Reset error states
+        document.querySelectorAll('.error-highlight').forEach(el => el.classList.remove('error-highlight'));
+        
+        // Validate sport
+        if (!sport.value) {
+            sport.classList.add('error-highlight');
+            errors.push('Please select your primary sport');
+            isValid = false;
+        }
+        
+        // Validate performance level
+        if (!level) {
+            document.querySelectorAll('.radio-option').forEach(el => el.classList.add('error-highlight'));
+            errors.push('Please select your performance level');
+            isValid = false;
+        }
+        
+        // Validate training goals
+        if (selectedGoals.length === 0) {
+            document.querySelector('.checkbox-grid').classList.add('error-highlight');
+            errors.push('Please select at least one training priority');
+            isValid = false;
+        }
+        
+        if (!isValid) {
+            event.preventDefault();
+            
+            // Show consolidated error message
+            showErrorMessage(errors.join(', '));
+            
+            // Scroll to first error
+            const firstError = document.querySelector('.error-highlight');
+            if (firstError) {
+                firstError.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            }
+        } else {
+            // Show loading state
+            submitBtn.classList.add('loading');
+            submitBtn.innerHTML = '<i class="bi bi-arrow-clockwise me-2"></i>Creating Your Plan...';
+            submitBtn.disabled = true;
+        }
+    });
+    
+    // Goal selection validation
+    goals.forEach(goal => {
+        goal.addEventListener('change', function() {
+            const checked = document.querySelectorAll('input[name="goals"]:checked');
+            if (checked.length > maxGoals) {
+                this.checked = false;
+                showWarningMessage(`For optimal focus, please select no more than ${maxGoals} priority areas`);
+            }
+        });
+    });
+    
+    // Reset error states on interaction
+    document.getElementById('sport').addEventListener('change', function() {
+        this.classList.remove('error-highlight');
+    });
+    
+    document.querySelectorAll('input[name="level"]').forEach(radio => {
+        radio.addEventListener('change', function() {
+            document.querySelectorAll('.radio-option').forEach(el => el.classList.remove('error-highlight'));
+        });
+    });
+    
+    document.querySelectorAll('input[name="goals"]').forEach(checkbox => {
+        checkbox.addEventListener('change', function() {
+            document.querySelector('.checkbox-grid').classList.remove('error-highlight');
+        });
+    });
+    
+    // Enhanced message display functions
+    function showErrorMessage(message) {
+        showMessage(message, 'danger');
+    }
+    
+    function showWarningMessage(message) {
+        showMessage(message, 'warning');
+    }
+    
+    function showMessage(message, type) {
+        const existingAlert = document.querySelector('.flash-messages .alert');
+        if (existingAlert) {
+            existingAlert.remove();
+        }
+        
+        const alertDiv = document.createElement('div');
+        alertDiv.className = `alert alert-${type} alert-dismissible fade show`;
+        alertDiv.innerHTML = `
+            <div class="d-flex align-items-center">
+                <i class="bi bi-${type === 'danger' ? 'exclamation-triangle' : 'info-circle'} me-2"></i>
+                ${message}
+            </div>
+            <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+        `;
+        
+        let flashContainer = document.querySelector('.flash-messages');
+        if (!flashContainer) {
+            flashContainer = document.createElement('div');
+            flashContainer.className = 'flash-messages mb-4';
+            form.prepend(flashContainer);
+        }
+        
+        flashContainer.prepend(alertDiv);
+        
+        // Auto-dismiss warning messages
+        if (type === 'warning') {
+            setTimeout(() => {
+                alertDiv.style.transition = 'all 0.5s ease-out';
+                alertDiv.style.transform = 'translateX(100%)';
+                alertDiv.style.opacity = '0';
+                setTimeout(() => alertDiv.remove(), 500);
+            }, 4000);
+        }
+        
+        // Scroll to message
+        alertDiv.scrollIntoView({ behavior: 'smooth', block: 'center' });
+    }
+    
+    // Add smooth animations to form sections
+    const observerOptions = {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    };
+    
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.style.opacity = '1';
+                entry.target.style.transform = 'translateY(0)';
+            }
+        });
+    }, observerOptions);
+    
+    document.querySelectorAll('.form-section').forEach((section, index) => {
+        section.style.opacity = '0';
+        section.style.transform = 'translateY(20px)';
+        section.style.transition = `all 0.6s ease ${index * 0.1}s`;
+        observer.observe(section);
+    });
+});
@@ -0,0 +1,45 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Animate content sections as they come into view
+    const observer = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                entry.target.classList.add('animate-in');
+            }
+        });
+    }, {
+        threshold: 0.1,
+        rootMargin: '0px 0px -50px 0px'
+    });
+
+    document.querySelectorAll('.content-section').forEach(section => {
+        observer.observe(section);
+    });
+
+    // Add smooth hover effects to all interactive elements
+    document.querySelectorAll('.btn, .metric-card, .highlight-box').forEach(element => {
+        element.addEventListener('mouseenter', function() {
+            this.style.transition = 'all 0.3s ease-out';
+        });
+    });
+
+    // Week and rest-day fields only apply when regenerating a week
+    const regenerateForm = document.getElementById('regenerate-form');
+    if (regenerateForm) {
+        const sectionSelect = regenerateForm.querySelector('select[name="section"]');
+        const weekFields = regenerateForm.querySelectorAll('[name="week"], [name="rest_days"]');
+        const toggleWeekFields = () => {
+            weekFields.forEach(field => {
+                field.disabled = sectionSelect.value !== 'week';
+                field.hidden = field.disabled;
+            });
+        };
+        sectionSelect.addEventListener('change', toggleWeekFields);
+        toggleWeekFields();
+    }
+
+    // Scroll to top of results with smooth animation
+    window.scrollTo({
+        top: 0,
+        behavior: 'smooth'
+    });
+});